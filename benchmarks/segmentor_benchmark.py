@@ -0,0 +1,42 @@
+"""
+Micro-benchmark of the segmentors on the texts in sample_data.
+
+Run from the repository root, as a module so that textmancy can be imported:
+    poetry run python -m benchmarks.segmentor_benchmark
+"""
+from pathlib import Path
+import timeit
+
+from textmancy.components.segmentor import (
+    ParagraphSegmentor,
+    PageSegmentor,
+    SceneSegmentor,
+    SentenceSegmentor,
+    TokenPageSegmentor,
+)
+
+SAMPLE_DATA = Path(__file__).parent.parent / "sample_data"
+REPEAT = 5
+NUMBER = 20
+
+segmentors = {
+    "ParagraphSegmentor": ParagraphSegmentor(),
+    "PageSegmentor": PageSegmentor(paragraphs_per_page=10),
+    "PageSegmentor (max_length)": PageSegmentor(paragraphs_per_page=10, max_length=2000),
+    "TokenPageSegmentor": TokenPageSegmentor(max_tokens=500),
+    "SentenceSegmentor": SentenceSegmentor(),
+    "SceneSegmentor": SceneSegmentor(),
+}
+
+for path in sorted(SAMPLE_DATA.glob("*.txt")):
+    text = path.read_text(encoding="utf-8")
+    print(f"{path.name} ({len(text)} chars)")
+    for name, segmentor in segmentors.items():
+        best = min(
+            timeit.repeat(lambda: segmentor.segment(text), repeat=REPEAT, number=NUMBER)
+        )
+        segments = segmentor.segment(text)
+        print(
+            f"  {name:<28} {best / NUMBER * 1000:8.3f} ms"
+            f"  {len(segments):6d} segments"
+        )
@@ -20,16 +20,16 @@ with open("sample_data/snows_of_kiliminjaro.txt", encoding="utf-8") as f:
 
 # Extract and consolidate characters
 processor = Processor(target_class=Character)
-results = processor.process(pages)
+result = processor.process(pages)
 
-for r in results:
+for r in result.targets:
     print(r)
     print()
 
 
 # Annotate pages with characters
 annotater = Annotator(
-    targets=results,
+    targets=result.targets,
     model="gpt-4o",
 )
 annotations = [annotater.annotate(page) for page in pages[:5]]
@@ -38,5 +38,8 @@ annotations = [annotater.annotate(page) for page in pages[:5]]
 for page, annotation in zip(pages, annotations):
     print(page)
     print(annotation)
-    print([results[i].name for i in annotation])
+    print([result.targets[i].name for i in annotation])
     print()
+
+# Save results
+result.save("snows_of_kiliminjaro.txmr")
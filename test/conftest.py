@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch):
+    """Components create model clients on init, which require an API key."""
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
@@ -0,0 +1,215 @@
+import argparse
+import json
+
+from textmancy import cli
+from textmancy.components.processor import Processor
+from textmancy.components.result import ResultWriter, TextmancyResult
+from textmancy.targets import Character, Theme
+
+import pytest
+
+
+@pytest.fixture
+def documents(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "a.txt").write_text("First page.\nSecond page.", encoding="utf-8")
+    (tmp_path / "nested" / "b.txt").write_text("Another text.", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("Not a text.", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def process_calls(monkeypatch):
+    calls = []
+
+    def process(self, texts, annotate=False, **kwargs):
+        calls.append(texts)
+        return TextmancyResult(
+            targets=[Theme(name="Regret", reasoning="Looking back")],
+            annotations=[[0] for _ in texts] if annotate else [],
+            provenance=[[0]],
+            metadata={"texts": len(texts), "timings": {"extract": 0.5}},
+        )
+
+    monkeypatch.setattr(Processor, "process", process)
+    return calls
+
+
+def test_find_documents(documents):
+    found = cli.find_documents([str(documents)])
+    assert found == [str(documents / "a.txt"), str(documents / "nested" / "b.txt")]
+
+    found = cli.find_documents([str(documents / "*.md"), str(documents / "a.txt")])
+    assert found == [str(documents / "a.txt"), str(documents / "notes.md")]
+
+    assert cli.find_documents([str(documents / "missing")]) == []
+
+
+def test_load_target_class():
+    assert cli.load_target_class("Character") is Character
+    assert cli.load_target_class("textmancy.targets:Theme") is Theme
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli.load_target_class("Missing")
+    with pytest.raises(argparse.ArgumentTypeError):
+        cli.load_target_class("List")
+
+
+def test_pipeline_cache(documents, process_calls):
+    pipeline = cli.Pipeline(
+        processor=Processor(Theme),
+        segmentor=cli.PageSegmentor(paragraphs_per_page=1),
+        cache_dir=str(documents / "cache"),
+    )
+    record = pipeline.run(str(documents / "a.txt"))
+    assert process_calls == [["First page.", "Second page."]]
+    assert record["targets"] == [{"name": "Regret", "reasoning": "Looking back"}]
+    assert record["annotations"] == [[0], [0]]
+    assert set(record["metadata"]["timings"]) == {"segment", "extract"}
+
+    cached = pipeline.run(str(documents / "a.txt"))
+    assert len(process_calls) == 1
+    assert cached["targets"] == record["targets"]
+    assert cached["metadata"]["cached"]
+
+
+def test_pipeline_unreadable_cache(documents, process_calls):
+    pipeline = cli.Pipeline(
+        processor=Processor(Theme),
+        segmentor=cli.PageSegmentor(paragraphs_per_page=1),
+        cache_dir=str(documents / "cache"),
+    )
+    cache_path = pipeline._cache_path((documents / "a.txt").read_text())
+    with open(cache_path, "wb") as f:
+        f.write(b"corrupt")
+
+    record = pipeline.run(str(documents / "a.txt"))
+    assert len(process_calls) == 1
+    assert "cached" not in record["metadata"]
+
+    cached = pipeline.run(str(documents / "a.txt"))
+    assert len(process_calls) == 1
+    assert cached["metadata"]["cached"]
+
+
+def test_pipeline_failed_save(documents, process_calls, monkeypatch):
+    pipeline = cli.Pipeline(
+        processor=Processor(Theme),
+        segmentor=cli.PageSegmentor(paragraphs_per_page=1),
+        cache_dir=str(documents / "cache"),
+    )
+
+    def failing_write(self, indices):
+        raise OSError("disk full")
+
+    # Fails after the targets have been written
+    with monkeypatch.context() as m:
+        m.setattr(ResultWriter, "write_annotation", failing_write)
+        assert "error" in pipeline._run_safe(str(documents / "a.txt"))
+    assert list((documents / "cache").iterdir()) == []
+
+    record = pipeline.run(str(documents / "a.txt"))
+    assert len(process_calls) == 2
+    assert "cached" not in record["metadata"]
+
+
+def test_main(documents, process_calls, capsys):
+    output = documents / "out.jsonl"
+    exit_code = cli.main(
+        [
+            str(documents),
+            "--target",
+            "Theme",
+            "--no-annotate",
+            "--concurrency",
+            "2",
+            "--output",
+            str(output),
+            "--profile",
+            "timings",
+            "--profile",
+            "tracemalloc",
+            "--profile-dir",
+            str(documents / "profile"),
+        ]
+    )
+    assert exit_code == 0
+
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(r["path"] for r in records) == [
+        str(documents / "a.txt"),
+        str(documents / "nested" / "b.txt"),
+    ]
+    assert all(r["annotations"] == [] for r in records)
+    assert (documents / "profile" / "textmancy.tracemalloc").exists()
+
+    err = capsys.readouterr().err
+    assert "Stage timings" in err
+    assert "extract" in err
+
+
+def test_pipeline_cache_key(documents, process_calls):
+    def pipeline(**kwargs):
+        processor_args = {
+            key: kwargs.pop(key) for key in ["target_class", "target_num"] if key in kwargs
+        }
+        return cli.Pipeline(
+            processor=Processor(**{"target_class": Theme, **processor_args}),
+            segmentor=cli.PageSegmentor(),
+            cache_dir=str(documents / "cache"),
+            **kwargs,
+        )
+
+    keys = {
+        pipeline()._cache_path("text"),
+        pipeline(target_num=5)._cache_path("text"),
+        pipeline(target_class=Character)._cache_path("text"),
+        pipeline(reuse_provenance=True)._cache_path("text"),
+        pipeline(coverage_threshold=0.9)._cache_path("text"),
+    }
+    assert len(keys) == 5
+    assert pipeline()._cache_path("text") in keys
+
+
+def test_main_profile_cprofile(documents, process_calls, capsys):
+    output = documents / "out.jsonl"
+    exit_code = cli.main(
+        [
+            str(documents),
+            "--concurrency",
+            "2",
+            "--output",
+            str(output),
+            "--profile",
+            "cprofile",
+            "--profile-dir",
+            str(documents / "profile"),
+        ]
+    )
+    assert exit_code == 0
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(records) == 2
+    assert all("error" not in record for record in records)
+    assert (documents / "profile" / "textmancy.prof").exists()
+    assert "cProfile stats written" in capsys.readouterr().err
+
+
+def test_main_timings_skip_cached(documents, process_calls, capsys):
+    args = [
+        str(documents / "a.txt"),
+        "--cache-dir",
+        str(documents / "cache"),
+        "--output",
+        str(documents / "out.jsonl"),
+        "--profile",
+        "timings",
+    ]
+    assert cli.main(args) == 0
+    assert "extract" in capsys.readouterr().err
+
+    assert cli.main(args) == 0
+    assert len(process_calls) == 1
+    assert "extract" not in capsys.readouterr().err
+
+
+def test_main_no_documents(tmp_path, capsys):
+    assert cli.main([str(tmp_path / "missing")]) == 1
@@ -0,0 +1,38 @@
+from textmancy.components.consolidator import Consolidator
+from textmancy.targets import Theme
+
+import pytest
+
+
+@pytest.fixture
+def consolidator():
+    return Consolidator(Theme, target_num=1, batch_size=2, max_iter=3, tolerance=1.5)
+
+
+class FakeRunnable:
+    """Merges every batch into its first target, referencing all inputs."""
+
+    def __init__(self, tracked_type, grouped_type):
+        self.tracked_type = tracked_type
+        self.grouped_type = grouped_type
+
+    def invoke(self, inputs):
+        targets = inputs["targets"]
+        first = targets[0]
+        merged = self.tracked_type(**first.dict(), sources=list(targets) + [99])
+        return self.grouped_type(Themes=[merged])
+
+
+def test_consolidate_with_sources(consolidator):
+    consolidator.consolidation_runnable = FakeRunnable(
+        consolidator.tracked_target_type, consolidator.grouped_target_type
+    )
+    items = [Theme(name=f"Theme {i}", reasoning="") for i in range(4)]
+    sources = [{0}, {1}, {1, 2}, {3}]
+
+    results, result_sources = consolidator.consolidate_with_sources(items, sources)
+    assert len(results) == 1
+    assert type(results[0]) is Theme
+    assert result_sources == [{0, 1, 2, 3}]
+
+    assert len(consolidator.consolidate(items)) == 1
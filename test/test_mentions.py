@@ -0,0 +1,121 @@
+from textmancy.components.mentions import Mention, MentionIndex, MentionIndexer
+from textmancy.targets import Character
+
+import pytest
+
+
+def make_character(name: str, known_as: list) -> Character:
+    return Character(
+        name=name,
+        description="",
+        physical_description="",
+        known_as=known_as,
+        summary_of_actions="",
+    )
+
+
+@pytest.fixture
+def targets():
+    return [
+        make_character("Ebenezer Scrooge", ["Scrooge"]),
+        make_character("Jacob Marley", ["Marley", "the Ghost"]),
+        make_character("Ghost of Christmas Past", ["the Ghost"]),
+    ]
+
+
+def test_mention_index_queries():
+    index = MentionIndex(
+        [
+            Mention(1, 30, 36, 1),
+            Mention(0, 0, 7, 0),
+            Mention(0, 12, 19, 0),
+        ],
+        page_starts=[0, 25],
+    )
+    assert len(index) == 3
+    assert [m.start for m in index] == [0, 12, 30]
+    assert index.between(5, 13) == [Mention(0, 0, 7, 0), Mention(0, 12, 19, 0)]
+    assert index.between(19, 30) == []
+    assert index.in_page(1) == [Mention(1, 30, 36, 1)]
+    assert index.for_target(0) == [Mention(0, 0, 7, 0), Mention(0, 12, 19, 0)]
+
+
+def test_mention_index_empty():
+    index = MentionIndex()
+    assert len(index) == 0
+    assert index.between(0, 100) == []
+    assert index.in_page(0) == []
+
+
+def test_indexer_exact_and_longest_alias(targets):
+    indexer = MentionIndexer(targets, resolve_ambiguous=False)
+    text = "Ebenezer Scrooge met Marley. scrooge's door."
+    index = indexer.index(text)
+    assert [(m.target, text[m.start : m.end]) for m in index] == [
+        (0, "Ebenezer Scrooge"),
+        (1, "Marley"),
+        (0, "scrooge"),
+    ]
+
+
+def test_indexer_fuzzy_variants(targets):
+    indexer = MentionIndexer(targets, resolve_ambiguous=False)
+    index = indexer.index("Old Marleys and Scroge. Nothing here.")
+    assert [m.target for m in index] == [1, 0]
+
+
+def test_indexer_pages(targets):
+    indexer = MentionIndexer(targets, resolve_ambiguous=False)
+    pages = ["Scrooge sat.", "Marley was dead."]
+    index = indexer.index(pages)
+    assert list(index.page_starts) == [0, 12]
+    assert list(index) == [Mention(0, 0, 7, 0), Mention(1, 12, 18, 1)]
+    assert index.in_page(1) == [Mention(1, 12, 18, 1)]
+
+
+def test_indexer_unresolved_ambiguous(targets):
+    indexer = MentionIndexer(targets, resolve_ambiguous=False)
+    index = indexer.index("Then the Ghost spoke.")
+    assert sorted(m.target for m in index) == [1, 2]
+
+
+def test_indexer_resolves_ambiguous(targets, monkeypatch):
+    indexer = MentionIndexer(targets)
+    calls = []
+
+    def resolve_batch(contexts, mention, candidates):
+        calls.append((len(contexts), mention, candidates))
+        return [{2} for _ in contexts]
+
+    monkeypatch.setattr(indexer, "_resolve_batch", resolve_batch)
+    index = indexer.index("Scrooge saw the Ghost.")
+    assert calls == [(1, "the ghost", {1, 2})]
+    assert [m.target for m in index] == [0, 2]
+
+
+def test_indexer_batches_ambiguous(targets, monkeypatch):
+    indexer = MentionIndexer(targets, resolve_batch_size=2)
+    calls = []
+
+    def resolve_batch(contexts, mention, candidates):
+        calls.append(len(contexts))
+        return [{1}, {2}][: len(contexts)]
+
+    monkeypatch.setattr(indexer, "_resolve_batch", resolve_batch)
+    pages = ["The Ghost came. The Ghost went.", "Then the Ghost returned."]
+    index = indexer.index(pages)
+    assert sorted(calls) == [1, 2]
+    assert [m.target for m in index] == [1, 2, 1]
+
+
+def test_indexer_resolve_batch_fallback(targets, monkeypatch):
+    indexer = MentionIndexer(targets)
+
+    class FakeRunnable:
+        def invoke(self, inputs):
+            assert "1: " in inputs["passages"]
+            return {"indices": [2, 0]}
+
+    indexer.resolution_runnable = FakeRunnable()
+    resolved = indexer._resolve_batch(["a", "b", "c"], "the ghost", {1, 2})
+    assert resolved == [{2}, {1, 2}, {1, 2}]
@@ -0,0 +1,125 @@
+from textmancy.components.annotator import Annotator
+from textmancy.components.consolidator import Consolidator
+from textmancy.components.extractor import Extractor
+from textmancy.components.plan import PlanEstimate, estimate_tokens
+from textmancy.components.processor import Processor
+from textmancy.targets import Theme
+
+import pytest
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_plan_estimate_add():
+    a = PlanEstimate(calls=1, prompt_tokens=10, completion_tokens=5, rounds=1)
+    b = PlanEstimate(calls=2, prompt_tokens=20, completion_tokens=5, rounds=1)
+    total = a + b
+    assert total.calls == 3
+    assert total.prompt_tokens == 30
+    assert total.completion_tokens == 10
+    assert total.total_tokens == 40
+    assert total.rounds == 2
+
+
+def test_plan_estimate_duration():
+    estimate = PlanEstimate(calls=10, prompt_tokens=900, completion_tokens=100)
+    assert estimate.duration() == 0
+    assert estimate.duration(requests_per_minute=10) == 60
+    assert estimate.duration(requests_per_minute=10, tokens_per_minute=500) == 120
+
+
+def test_extractor_plan_chunks():
+    extractor = Extractor(Theme, target_num=2)
+    estimate = extractor.plan("a" * 10, chunk_size=4, tokens_per_target=10)
+    assert estimate.calls == 3
+    assert estimate.completion_tokens == 60
+    assert estimate.rounds == 1
+    assert estimate.targets == 6
+
+    estimate = extractor.plan(iter(["aaa", "aaa", "a"]), chunk_size=4)
+    assert estimate.calls == 2
+
+
+@pytest.mark.parametrize("num_items, calls, rounds, targets", [
+    (0, 0, 0, 0),
+    (5, 1, 1, 3),
+    (11, 2, 1, 4),
+    (40, 4 + 2 + 1, 3, 3),
+])
+def test_consolidator_plan_rounds(num_items, calls, rounds, targets):
+    consolidator = Consolidator(Theme, target_num=3, batch_size=10, max_iter=3)
+    estimate = consolidator.plan(num_items)
+    assert estimate.calls == calls
+    assert estimate.rounds == rounds
+    assert estimate.targets == targets
+
+
+def test_consolidator_plan_max_iter():
+    consolidator = Consolidator(Theme, target_num=3, batch_size=3, max_iter=1)
+    estimate = consolidator.plan(30)
+    assert estimate.rounds == 2
+    assert estimate.calls == 20
+    assert estimate.targets == 30
+
+
+def test_annotator_plan():
+    targets = [Theme(name=f"Theme {i}", reasoning="") for i in range(3)]
+    annotator = Annotator(targets)
+    estimate = annotator.plan("a" * 10, chunk_size=4)
+    assert estimate.calls == 3
+    assert estimate.completion_tokens == 3 * 3 * 2
+
+    # Every chunk prompt repeats the target list
+    longer = Annotator(targets * 10).plan("a" * 10, chunk_size=4)
+    assert longer.prompt_tokens > estimate.prompt_tokens + 3 * 10
+
+
+def test_annotator_project_plan():
+    estimate = Annotator.project_plan(
+        "Theme", "a" * 10, num_targets=5, tokens_per_target=100, chunk_size=4
+    )
+    assert estimate.calls == 3
+    assert estimate.prompt_tokens > 3 * 5 * 100
+    assert estimate.completion_tokens == 3 * 5 * 2
+
+    fewer = Annotator.project_plan(
+        "Theme", "a" * 10, num_targets=4, tokens_per_target=100, chunk_size=4
+    )
+    assert estimate.prompt_tokens - fewer.prompt_tokens >= 3 * 100
+
+
+def test_processor_plan():
+    processor = Processor(Theme, target_num=5)
+    texts = ["a" * 3000] * 4
+
+    estimate = processor.plan(texts)
+    assert set(estimate.stages) == {"extract", "consolidate"}
+    assert estimate.calls == 2 + 1
+    assert estimate.stages["extract"].calls == 2
+    assert estimate.stages["consolidate"].calls == 1
+
+    annotated = processor.plan(texts, annotate=True)
+    annotation = annotated.stages["annotate"]
+    assert set(annotated.stages) == {"extract", "consolidate", "annotate"}
+    assert annotation.calls == 4
+    assert annotation.rounds == 4
+    assert annotated.calls == estimate.calls + annotation.calls
+    assert annotated.prompt_tokens == estimate.prompt_tokens + annotation.prompt_tokens
+
+
+def test_processor_plan_annotates_projected_targets():
+    processor = Processor(Theme, target_num=5)
+    processor.consolidator.max_iter = 0
+    texts = ["a" * 3000] * 16
+
+    estimate = processor.plan(texts, annotate=True)
+    consolidation = estimate.stages["consolidate"]
+    assert consolidation.targets > processor.consolidator.target_num
+    assert estimate.targets == consolidation.targets
+
+    projected = Annotator.project_plan("Theme", texts[0], consolidation.targets)
+    assert estimate.stages["annotate"].prompt_tokens == 16 * projected.prompt_tokens
@@ -0,0 +1,120 @@
+from textmancy.components import processor as processor_module
+from textmancy.components.processor import Processor
+from textmancy.components.result import TextmancyResult
+from textmancy.targets import Theme
+
+import pytest
+
+
+@pytest.fixture
+def themes():
+    return [
+        Theme(name="Regret", reasoning="Looking back"),
+        Theme(name="Redemption", reasoning="Changing ways"),
+        Theme(name="Charity", reasoning="Giving"),
+    ]
+
+
+@pytest.fixture
+def processor(monkeypatch, themes):
+    processor = Processor(Theme)
+
+    def extract_with_sources(stream, chunk_size):
+        chunks = list(processor.extractor._chunk_input(stream, chunk_size))
+        return [object() for _ in chunks], [{i} for i in range(len(chunks))]
+
+    # Regret comes from the first two chunks, Redemption from the first
+    def consolidate_with_sources(items, sources):
+        return themes, [{0, 1}, {0}, set()]
+
+    monkeypatch.setattr(processor.extractor, "extract_with_sources", extract_with_sources)
+    monkeypatch.setattr(
+        processor.consolidator, "consolidate_with_sources", consolidate_with_sources
+    )
+    return processor
+
+
+class FakeAnnotator:
+    instances = []
+
+    def __init__(self, targets, **kwargs):
+        self.targets = targets
+        self.annotated = []
+        FakeAnnotator.instances.append(self)
+
+    def annotate(self, text):
+        self.annotated.append(text)
+        return {i for i, target in enumerate(self.targets) if target.name in text}
+
+
+@pytest.fixture
+def annotator(monkeypatch):
+    FakeAnnotator.instances = []
+    monkeypatch.setattr(processor_module, "Annotator", FakeAnnotator)
+    return FakeAnnotator
+
+
+def test_chunk_pages(processor):
+    texts = ["a" * 3000, "b" * 3000, "c" * 12000, "d" * 10]
+    assert processor._chunk_pages(texts) == [[0, 1], [2], [2, 3]]
+    assert processor._chunk_pages([]) == []
+
+
+def page(name: str = "", size: int = 5000) -> str:
+    return name.ljust(size, ".")
+
+
+def test_process_result(processor, themes):
+    result = processor.process(["a" * 5000] * 3)
+    assert isinstance(result, TextmancyResult)
+    assert result.targets == themes
+    assert result.provenance == [[0, 1], [0], []]
+    assert result.annotations == []
+    assert result.metadata["texts"] == 3
+    assert result.metadata["chunk_pages"] == [[0, 1], [2]]
+    assert result.provenance_pages == [[0, 1], [0, 1], [0]]
+    assert result.combined_annotations() == []
+
+
+def test_process_annotate_reuses_provenance(processor, annotator, themes):
+    # Chunks cover pages [0, 1], [2, 3] and [4]
+    texts = [page("Charity"), page(), page("Redemption"), page(), page("Regret")]
+    result = processor.process(
+        texts, annotate=True, reuse_provenance=True, coverage_threshold=0.5
+    )
+    assert result.provenance_pages == [[0, 1], [0, 1], [0], [0], []]
+
+    # Regret covers more than half the pages, so is never checked. Other targets are
+    # only checked on pages they are not attributed to, including covered pages.
+    checked = {
+        tuple(t.name for t in instance.targets): instance.annotated
+        for instance in annotator.instances
+    }
+    assert checked == {
+        ("Charity",): texts[:2],
+        ("Redemption", "Charity"): texts[2:],
+    }
+    assert result.annotations == [[2], [], [1], [], []]
+    assert result.combined_annotations() == [[0, 1, 2], [0, 1], [0, 1], [0], []]
+    assert result.metadata["annotated"] == 5
+
+
+def test_process_annotate_skips_fully_attributed_pages(processor, annotator):
+    texts = [page(), page(), page()]
+    result = processor.process(
+        texts, annotate=True, reuse_provenance=True, coverage_threshold=0.0
+    )
+    assert annotator.instances == []
+    assert result.annotations == [[], [], []]
+    assert result.metadata["annotated"] == 0
+
+
+def test_process_annotate_without_provenance(processor, annotator, themes):
+    texts = [page("Regret Charity"), page("Redemption"), page()]
+    result = processor.process(texts, annotate=True)
+
+    (instance,) = annotator.instances
+    assert instance.targets == themes
+    assert instance.annotated == texts
+    assert result.annotations == [[0, 2], [1], []]
+    assert result.combined_annotations() == result.annotations
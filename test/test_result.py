@@ -0,0 +1,181 @@
+from datetime import datetime
+
+from textmancy.components import result as result_module
+from textmancy.components.result import (
+    FORMAT_VERSION,
+    ResultReader,
+    ResultWriter,
+    TextmancyResult,
+)
+from textmancy.targets import Theme
+
+import pytest
+
+
+@pytest.fixture
+def result():
+    return TextmancyResult(
+        targets=[
+            Theme(name="Regret", reasoning="Looking back"),
+            Theme(name="Redemption", reasoning="Changing ways"),
+        ],
+        annotations=[[0], [], [1, 0]],
+        provenance=[[0, 2], [1]],
+        provenance_pages=[[0, 1], [1], []],
+        metadata={"model": "test"},
+    )
+
+
+def test_result_save_load(tmp_path, result):
+    path = tmp_path / "result.txmr"
+    result.save(str(path))
+
+    loaded = TextmancyResult.load(str(path))
+    assert loaded.targets == result.targets
+    assert loaded.annotations == [[0], [], [0, 1]]
+    assert loaded.provenance == result.provenance
+    assert loaded.provenance_pages == result.provenance_pages
+    assert loaded.metadata == result.metadata
+
+
+def test_result_save_load_empty(tmp_path):
+    path = tmp_path / "result.txmr"
+    TextmancyResult().save(str(path))
+
+    loaded = TextmancyResult.load(str(path))
+    assert loaded.targets == []
+    assert loaded.annotations == []
+
+
+def test_result_reader_lazy(tmp_path, result):
+    path = tmp_path / "result.txmr"
+    result.save(str(path))
+
+    with ResultReader(str(path)) as reader:
+        assert reader.target_class is Theme
+        assert len(reader.targets) == 2
+        assert reader.targets[-1].name == "Redemption"
+        assert reader.targets[:1] == result.targets[:1]
+        assert reader.annotations[2] == [0, 1]
+        assert reader.provenance[0] == [0, 2]
+        assert reader.provenance_pages[1] == [1]
+        with pytest.raises(IndexError):
+            reader.targets[2]
+
+
+def test_result_reader_unknown_class(tmp_path):
+    path = tmp_path / "result.txmr"
+    with ResultWriter(str(path)) as writer:
+        writer.write_target(Theme(name="Regret", reasoning="Looking back"), [3])
+    path.write_bytes(path.read_bytes().replace(b"textmancy.targets", b"missing.targetsxx"))
+
+    with ResultReader(str(path)) as reader:
+        assert reader.target_class is None
+        assert reader.targets[0] == {"name": "Regret", "reasoning": "Looking back"}
+
+
+def test_result_reader_validation(tmp_path, result):
+    path = tmp_path / "result.txmr"
+    path.write_bytes(b"not a result file at all")
+    with pytest.raises(ValueError):
+        ResultReader(str(path))
+
+    result.save(str(path))
+    data = bytearray(path.read_bytes())
+    data[4] = FORMAT_VERSION + 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        ResultReader(str(path))
+
+
+@pytest.mark.parametrize("corrupt", [
+    lambda data: data[:3],
+    lambda data: data[:20],
+    lambda data: data[:-30],
+    lambda data: data[:-4] + b"XXXX",
+    lambda data: data[:-20] + b"\xff" * 16 + data[-4:],
+])
+def test_result_reader_corrupt_files(tmp_path, result, corrupt):
+    path = tmp_path / "result.txmr"
+    result.save(str(path))
+    path.write_bytes(corrupt(path.read_bytes()))
+    with pytest.raises(ValueError):
+        ResultReader(str(path))
+
+
+def test_result_reader_closes_buffer_on_error(tmp_path, result, monkeypatch):
+    buffers = []
+    mmap_class = result_module.mmap.mmap
+
+    def tracking_mmap(*args, **kwargs):
+        buffers.append(mmap_class(*args, **kwargs))
+        return buffers[-1]
+
+    monkeypatch.setattr(result_module.mmap, "mmap", tracking_mmap)
+    path = tmp_path / "result.txmr"
+    result.save(str(path))
+    path.write_bytes(path.read_bytes()[:-30])
+    with pytest.raises(ValueError):
+        ResultReader(str(path))
+    assert buffers and all(buffer.closed for buffer in buffers)
+
+
+def test_result_reader_without_import(tmp_path, result):
+    path = tmp_path / "result.txmr"
+    result.save(str(path))
+
+    with ResultReader(str(path), import_target_class=False) as reader:
+        assert reader.target_class is None
+        assert reader.targets[0] == {"name": "Regret", "reasoning": "Looking back"}
+
+    with ResultReader(str(path), Theme, import_target_class=False) as reader:
+        assert reader.targets[0] == result.targets[0]
+
+    loaded = TextmancyResult.load(str(path), import_target_class=False)
+    assert loaded.targets[1] == {"name": "Redemption", "reasoning": "Changing ways"}
+
+
+def test_result_writer_aborts_on_error(tmp_path, result):
+    path = tmp_path / "result.txmr"
+    with pytest.raises(RuntimeError):
+        with ResultWriter(str(path)) as writer:
+            writer.write_target(result.targets[0], [0])
+            raise RuntimeError("interrupted")
+    assert list(tmp_path.iterdir()) == []
+
+    # An existing file is left untouched
+    result.save(str(path))
+    with pytest.raises(RuntimeError):
+        with ResultWriter(str(path)) as writer:
+            raise RuntimeError("interrupted")
+    assert TextmancyResult.load(str(path)).targets == result.targets
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_result_writer_bad_metadata(tmp_path, result):
+    path = tmp_path / "result.txmr"
+    result.metadata["started"] = datetime(2024, 1, 1)
+    with pytest.raises(TypeError):
+        result.save(str(path))
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_result_combined_annotations(result):
+    assert result.combined_annotations() == [[0], [], [1, 0]]
+
+    result.metadata["reuse_provenance"] = True
+    assert result.combined_annotations() == [[0, 1], [1], [0, 1]]
+
+
+def test_result_reader_missing_table(tmp_path, result, monkeypatch):
+    monkeypatch.setattr(
+        result_module, "_RECORD_KINDS", ("targets", "annotations", "provenance")
+    )
+    path = tmp_path / "result.txmr"
+    result.provenance_pages = []
+    result.save(str(path))
+    monkeypatch.undo()
+
+    loaded = TextmancyResult.load(str(path))
+    assert loaded.annotations == [[0], [], [0, 1]]
+    assert loaded.provenance_pages == []
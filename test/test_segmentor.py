@@ -1,4 +1,11 @@
-from textmancy.components.segmentor import Segmentor, ParagraphSegmentor, PageSegmentor
+from textmancy.components.segmentor import (
+    Segmentor,
+    ParagraphSegmentor,
+    PageSegmentor,
+    SceneSegmentor,
+    SentenceSegmentor,
+    TokenPageSegmentor,
+)
 
 import pytest
 
@@ -40,6 +47,26 @@ def test_segmentor_handle_max_length():
         segmentor.segment(text)
 
 
+def test_segmentor_split_recursive():
+    segmentor = ParagraphSegmentor(max_length=10)
+    assert segmentor.segment("a" * 35) == ["a" * 10, "a" * 10, "a" * 10, "a" * 5]
+
+
+def test_segmentor_split_natural_boundaries():
+    segmentor = ParagraphSegmentor(max_length=20)
+    text = "One two. Three four five six seven"
+    segments = segmentor.segment(text)
+    assert segments == ["One two. Three four ", "five six seven"]
+    assert all(len(s) <= 20 for s in segments)
+    assert "".join(segments) == text
+
+    segmentor = ParagraphSegmentor(max_length=25)
+    assert segmentor.segment("One two three four. Five six seven") == [
+        "One two three four. ",
+        "Five six seven",
+    ]
+
+
 def test_paragraph_segmentor_empty_text():
     segmentor = ParagraphSegmentor()
     text = ""
@@ -86,3 +113,68 @@ def test_page_segmentor_multiple_pages():
         "This is the third para.\nThis is the fourth para."
     ]
     assert segmentor.segment(text) == expected_output
+
+
+def test_sentence_segmentor():
+    segmentor = SentenceSegmentor()
+    text = (
+        'Mr. Scrooge sat. "Bah!" said he. Was it\nhumbug?\n\n'
+        "A title\n\nThe end"
+    )
+    expected_output = [
+        "Mr. Scrooge sat.",
+        '"Bah!"',
+        "said he.",
+        "Was it\nhumbug?",
+        "A title",
+        "The end",
+    ]
+    assert segmentor.segment(text) == expected_output
+
+
+def test_sentence_segmentor_empty_text():
+    assert SentenceSegmentor().segment("") == []
+
+
+def test_scene_segmentor_headings_and_separators():
+    segmentor = SceneSegmentor()
+    text = (
+        "Title page\n\n"
+        "CHAPTER I\nThe first chapter.\n"
+        "Part of it goes here.\n"
+        "* * *\n"
+        "After the break.\n"
+        "Stave Two: The Ghost\n"
+        "The second chapter.\n"
+        "II.\n"
+        "Numbered section."
+    )
+    expected_output = [
+        "Title page",
+        "CHAPTER I\nThe first chapter.\nPart of it goes here.",
+        "After the break.",
+        "Stave Two: The Ghost\nThe second chapter.",
+        "II.\nNumbered section.",
+    ]
+    assert segmentor.segment(text) == expected_output
+
+
+def test_scene_segmentor_no_boundaries():
+    segmentor = SceneSegmentor()
+    assert segmentor.segment("Just prose.\nMore prose.") == ["Just prose.\nMore prose."]
+
+
+def test_token_page_segmentor():
+    segmentor = TokenPageSegmentor(max_tokens=5)
+    text = "aaaaaaaa\nbbbbbbbb\ncccc\n\ndddddddddddddddd\n"
+    expected_output = ["aaaaaaaa\nbbbbbbbb", "cccc", "dddddddddddddddd"]
+    assert segmentor.segment(text) == expected_output
+
+
+def test_token_page_segmentor_splits_long_paragraphs():
+    segmentor = TokenPageSegmentor(max_tokens=5)
+    text = "short\n" + "word " * 10
+    segments = segmentor.segment(text)
+    assert segments[0] == "short"
+    assert all(len(s) <= 20 for s in segments)
+    assert len(segments) == 4
@@ -39,3 +39,14 @@ def test_text_generator_with_empty_input():
     output = list(generator)
 
     assert output == expected_output
+
+
+def test_text_generator_keeps_order():
+    texts = ["ab", "cdefghijklmn", "op"]
+    max_chunk_size = 5
+    expected_output = ["ab", "cdefg", "hijkl", "mn", "op"]
+
+    generator = text_generator(texts, max_chunk_size)
+    output = list(generator)
+
+    assert output == expected_output
@@ -0,0 +1,370 @@
+import argparse
+import cProfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import glob
+import hashlib
+import importlib
+import json
+import logging
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from typing import Iterator, List, Optional, TextIO
+
+from langchain.pydantic_v1 import BaseModel
+
+from .components import PageSegmentor, Processor, TextmancyResult
+from . import targets
+
+PROFILE_MODES = ["cprofile", "tracemalloc", "timings"]
+
+
+def find_documents(paths: List[str], pattern: str = "*.txt") -> List[str]:
+    """
+    Expands the given files, directories and glob patterns into a sorted list of files.
+    Directories are searched recursively for files matching `pattern`.
+    """
+    documents = set()
+    for path in paths:
+        if os.path.isdir(path):
+            documents.update(
+                glob.glob(os.path.join(path, "**", pattern), recursive=True)
+            )
+        elif os.path.isfile(path):
+            documents.add(path)
+        else:
+            documents.update(glob.glob(path, recursive=True))
+    return sorted(d for d in documents if os.path.isfile(d))
+
+
+def load_target_class(name: str) -> type[BaseModel]:
+    """
+    Returns a target class from `textmancy.targets`, or from a `module:Class` path.
+    """
+    module, _, attr = name.rpartition(":")
+    try:
+        obj = getattr(importlib.import_module(module) if module else targets, attr)
+    except (ImportError, AttributeError):
+        raise argparse.ArgumentTypeError(f"Unknown target class {name}")
+    if not (isinstance(obj, type) and issubclass(obj, BaseModel)):
+        raise argparse.ArgumentTypeError(f"{name} is not a pydantic model")
+    return obj
+
+
+class Pipeline:
+    """
+    A class that runs segmentation, extraction, consolidation and annotation over
+    documents, caching each document's result.
+
+    Attributes:
+        processor (Processor): The processor used for each document.
+        segmentor (PageSegmentor): The segmentor used to split documents into pages.
+        annotate (bool): Whether to annotate the pages of each document.
+        reuse_provenance (bool): Whether to skip annotating targets already attributed
+            to a page from the extraction chunks.
+        coverage_threshold (float): The fraction of pages above which a target is not
+            annotated when reusing provenance.
+        cache_dir (str): The directory to cache results in, if any.
+    """
+
+    def __init__(
+        self,
+        processor: Processor,
+        segmentor: PageSegmentor,
+        annotate: bool = True,
+        reuse_provenance: bool = False,
+        coverage_threshold: float = 0.5,
+        cache_dir: Optional[str] = None,
+    ):
+        self._logger = logging.getLogger(__name__)
+
+        self.processor = processor
+        self.segmentor = segmentor
+        self.annotate = annotate
+        self.reuse_provenance = reuse_provenance
+        self.coverage_threshold = coverage_threshold
+        self.cache_dir = cache_dir
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _cache_path(self, text: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        target_class = self.processor.target_class
+        key = hashlib.sha256(text.encode("utf-8"))
+        key.update(
+            json.dumps(
+                [
+                    f"{target_class.__module__}:{target_class.__qualname__}",
+                    self.processor.model,
+                    self.processor.extractor.target_num,
+                    self.processor.consolidator.target_num,
+                    self.processor.chunk_size,
+                    self.processor.stream_chunk_size,
+                    self.segmentor._paragraphs_per_page,
+                    self.annotate,
+                    self.reuse_provenance,
+                    self.coverage_threshold,
+                ]
+            ).encode("utf-8")
+        )
+        return os.path.join(self.cache_dir, f"{key.hexdigest()}.txmr")
+
+    def run(self, path: str) -> dict:
+        """
+        Processes a single document and returns a JSON-serializable record.
+        """
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+
+        cache_path = self._cache_path(text)
+        result = None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                result = TextmancyResult.load(cache_path, self.processor.target_class)
+            except ValueError as e:
+                self._logger.warning(f"Ignoring unreadable cached result for {path}: {e}")
+            else:
+                self._logger.info(f"Using cached result for {path}")
+                result.metadata["cached"] = True
+
+        if result is None:
+            self._logger.info(f"Processing {path}")
+            segment_started = time.perf_counter()
+            pages = self.segmentor.segment(text)
+            segment_time = time.perf_counter() - segment_started
+
+            result = self.processor.process(
+                pages,
+                annotate=self.annotate,
+                reuse_provenance=self.reuse_provenance,
+                coverage_threshold=self.coverage_threshold,
+            )
+            result.metadata["timings"] = {
+                "segment": segment_time,
+                **result.metadata.get("timings", {}),
+            }
+            if cache_path:
+                # Saved to a temporary file and moved into place, so an interrupted
+                # save or a concurrent run never leaves a partial cache entry
+                result.save(cache_path)
+
+        return {
+            "path": path,
+            "targets": [target.dict() for target in result.targets],
+            "annotations": result.combined_annotations(),
+            "provenance": result.provenance,
+            "provenance_pages": result.provenance_pages,
+            "metadata": result.metadata,
+        }
+
+    def _run_safe(self, path: str) -> dict:
+        try:
+            return self.run(path)
+        except Exception as e:
+            self._logger.error(f"Failed to process {path}: {e}")
+            return {"path": path, "error": str(e)}
+
+    def run_all(self, paths: List[str], concurrency: int = 1) -> Iterator[dict]:
+        """
+        Processes the documents concurrently, yielding records as they complete.
+        With a concurrency of 1, documents are processed in the calling thread.
+        """
+        if concurrency <= 1:
+            for path in paths:
+                yield self._run_safe(path)
+            return
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(self._run_safe, path) for path in paths]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def _write_timings(timings: List[dict], out: TextIO) -> None:
+    totals = {}
+    for document_timings in timings:
+        for stage, seconds in document_timings.items():
+            totals[stage] = totals.get(stage, 0.0) + seconds
+
+    out.write("Stage timings (s):\n")
+    for stage, seconds in totals.items():
+        out.write(f"  {stage:<12} {seconds:10.3f}\n")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="textmancy",
+        description=(
+            "Extract, consolidate and annotate targets in text documents, "
+            "writing one JSON line per document."
+        ),
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="Files, directories or glob patterns to process"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="*.txt",
+        help="File pattern used when searching directories (default: *.txt)",
+    )
+    parser.add_argument(
+        "-o", "--output", help="File to write JSON lines to (default: stdout)"
+    )
+    parser.add_argument(
+        "--target",
+        default="Character",
+        type=load_target_class,
+        help="Target class from textmancy.targets, or module:Class (default: Character)",
+    )
+    parser.add_argument(
+        "--target-num", type=int, default=3, help="Number of targets to look for"
+    )
+    parser.add_argument("--model", default="gpt-4o", help="Model name")
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Documents processed at once"
+    )
+    parser.add_argument(
+        "--paragraphs-per-page", type=int, default=10, help="Paragraphs per page"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=4000, help="Characters per extraction chunk"
+    )
+    parser.add_argument(
+        "--stream-chunk-size",
+        type=int,
+        default=10000,
+        help="Maximum characters per piece of the page stream",
+    )
+    parser.add_argument(
+        "--no-annotate", action="store_true", help="Skip annotating pages"
+    )
+    parser.add_argument(
+        "--reuse-provenance",
+        action="store_true",
+        help="Skip annotating targets already attributed to a page by extraction",
+    )
+    parser.add_argument(
+        "--coverage-threshold",
+        type=float,
+        default=0.5,
+        help="With --reuse-provenance, fraction of pages above which a target is "
+        "not annotated (default: 0.5)",
+    )
+    parser.add_argument("--cache-dir", help="Directory to cache document results in")
+    parser.add_argument(
+        "--profile",
+        action="append",
+        choices=PROFILE_MODES,
+        default=[],
+        help=(
+            "Profile the run; may be given several times. cprofile runs documents "
+            "one at a time and does not cover the model request threads"
+        ),
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default=".",
+        help="Directory for cProfile and tracemalloc output (default: .)",
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="count", default=0, help="Increase log verbosity"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.WARNING - 10 * min(args.verbose, 2),
+        format="[%(levelname)s] %(name)s: %(message)s",
+        stream=sys.stderr,
+    )
+
+    paths = find_documents(args.paths, args.pattern)
+    if not paths:
+        print("No documents found", file=sys.stderr)
+        return 1
+
+    pipeline = Pipeline(
+        processor=Processor(
+            target_class=args.target,
+            target_num=args.target_num,
+            model=args.model,
+            chunk_size=args.chunk_size,
+            stream_chunk_size=args.stream_chunk_size,
+        ),
+        segmentor=PageSegmentor(paragraphs_per_page=args.paragraphs_per_page),
+        annotate=not args.no_annotate,
+        reuse_provenance=args.reuse_provenance,
+        coverage_threshold=args.coverage_threshold,
+        cache_dir=args.cache_dir,
+    )
+
+    # Only one profiler may be active per process, so profile the whole run from
+    # this thread and process documents in it
+    concurrency = args.concurrency
+    profiler = None
+    if "cprofile" in args.profile:
+        if concurrency > 1:
+            logging.getLogger(__name__).warning(
+                "cprofile runs documents one at a time, ignoring --concurrency"
+            )
+        concurrency = 1
+        profiler = cProfile.Profile()
+
+    if args.profile:
+        os.makedirs(args.profile_dir, exist_ok=True)
+    if "tracemalloc" in args.profile:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    timings = []
+    failed = False
+    try:
+        for record in pipeline.run_all(paths, concurrency=concurrency):
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            metadata = record.get("metadata", {})
+            if not metadata.get("cached"):
+                timings.append(metadata.get("timings", {}))
+            failed = failed or "error" in record
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+        if profiler:
+            profiler.disable()
+            stats = pstats.Stats(profiler, stream=sys.stderr)
+            profile_path = os.path.join(args.profile_dir, "textmancy.prof")
+            stats.dump_stats(profile_path)
+            print(f"cProfile stats written to {profile_path}", file=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(20)
+
+        if "tracemalloc" in args.profile:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            snapshot_path = os.path.join(args.profile_dir, "textmancy.tracemalloc")
+            snapshot.dump(snapshot_path)
+            print(
+                f"tracemalloc snapshot written to {snapshot_path}, "
+                f"peak {peak / 2**20:.1f} MiB",
+                file=sys.stderr,
+            )
+            for stat in snapshot.statistics("lineno")[:10]:
+                print(f"  {stat}", file=sys.stderr)
+
+        if "timings" in args.profile:
+            _write_timings(timings, sys.stderr)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,32 @@
 from .annotator import Annotator
 from .consolidator import Consolidator
 from .extractor import Extractor
+from .mentions import MentionIndex, MentionIndexer
+from .plan import PlanEstimate
 from .processor import Processor
-from .segmentor import ParagraphSegmentor, PageSegmentor
+from .result import ResultReader, ResultWriter, TextmancyResult
+from .segmentor import (
+    ParagraphSegmentor,
+    PageSegmentor,
+    SceneSegmentor,
+    SentenceSegmentor,
+    TokenPageSegmentor,
+)
 
 __all__ = [
     "Annotator",
     "Consolidator",
     "Extractor",
+    "MentionIndex",
+    "MentionIndexer",
+    "PlanEstimate",
     "Processor",
+    "ResultReader",
+    "ResultWriter",
+    "TextmancyResult",
     "ParagraphSegmentor",
-    "PageSegmentor"
+    "PageSegmentor",
+    "SceneSegmentor",
+    "SentenceSegmentor",
+    "TokenPageSegmentor",
 ]
@@ -1,4 +1,5 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
 import logging
 from typing import List
 
@@ -6,6 +7,11 @@ from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain.pydantic_v1 import BaseModel
 
+from .plan import TOKENS_PER_TARGET, PlanEstimate, estimate_tokens
+
+# Rough size of a single returned index in a completion
+_TOKENS_PER_INDEX = 2
+
 
 class Annotator:
     """
@@ -43,38 +49,50 @@ class Annotator:
                 break
 
         # Schema
-        self.json_schema = {
-            "title": f"{self.target_name}s",
+        self.json_schema = self._create_json_schema(
+            self.target_name, example, len(self.targets)
+        )
+
+        # Create runnable
+        self.annotation_prompt = self._create_annotation_prompt()
+        self.annotation_runnable = self.annotation_prompt | ChatOpenAI(
+            model=model
+        ).with_structured_output(self.json_schema)
+
+    @staticmethod
+    def _create_json_schema(target_name: str, example: dict, num_targets: int) -> dict:
+        return {
+            "title": f"{target_name}s",
             "description": (
-                f"List of {self.target_name}s indices that are present in the text, 0-based. For example, "  # noqa: E501
+                f"List of {target_name}s indices that are present in the text, 0-based. For example, "  # noqa: E501
                 f"if [{example}] is present in the text, then include 0 in the response."
             ),
             "type": "object",
             "properties": {
                 "indices": {
-                    "title": f"{self.target_name}s",
-                    "description": f"List of 0-based indices of {self.target_name}s that are present in the text.",  # noqa: E501
+                    "title": f"{target_name}s",
+                    "description": f"List of 0-based indices of {target_name}s that are present in the text.",  # noqa: E501
                     "type": "array",
                     "items": {
                         "type": "number",
-                        "enum": [i for i in range(len(self.targets))],
+                        "enum": [i for i in range(num_targets)],
                     },
                 },
             },
         }
 
-        # Create runnable
-        prompt = self._create_annotation_prompt()
-        self.annotation_runnable = prompt | ChatOpenAI(
-            model=model
-        ).with_structured_output(self.json_schema)
+    @staticmethod
+    def _create_annotation_template(target_name: str, targets: str) -> str:
+        return (
+            f"You are tasked with annotating a text sample to identify {target_name}s. "
+            f"Here is an ordered list of valid targets: \n {targets}\n"
+            "Here is the text sample: \n {text} \n"
+            f"Please return all of the given {target_name} indices that are in the text."
+        )
 
     def _create_annotation_prompt(self) -> ChatPromptTemplate:
         return ChatPromptTemplate.from_template(
-            f"You are tasked with annotating a text sample to identify {self.target_name}s. "
-            f"Here is an ordered list of valid targets: \n {self.targets}\n"
-            "Here is the text sample: \n {text} \n"
-            f"Please return all of the given {self.target_name} indices that are in the text."
+            self._create_annotation_template(self.target_name, str(self.targets))
         )
 
     def _annotate_chunk(self, text: str) -> list:
@@ -92,6 +110,10 @@ class Annotator:
             return []
         return result["indices"]
 
+    @staticmethod
+    def _chunk_text(text: str, chunk_size: int) -> list:
+        return [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+
     def annotate(self, text: str, chunk_size=4000, **kwargs) -> set:
         """
         Annotates the given text to identify target indices.
@@ -107,8 +129,7 @@ class Annotator:
         futures = []
 
         # Split text into chunks and extract asynchronously
-        for i in range(0, len(text), chunk_size):
-            text_chunk = text[i : i + chunk_size]
+        for text_chunk in self._chunk_text(text, chunk_size):
             futures.append(pool.submit(self._annotate_chunk, text_chunk, **kwargs))
 
         # Retrieve results as they complete
@@ -127,3 +148,67 @@ class Annotator:
             for i in results
             if i is not None and i < len(self.targets) and i >= 0
         }
+
+    def plan(self, text: str, chunk_size=4000) -> PlanEstimate:
+        """
+        Estimates the calls and tokens `annotate` would use, without calling the model.
+        Completion tokens are an upper bound, assuming every target is returned.
+
+        Args:
+            text (str): The text to annotate.
+            chunk_size (int, optional): The size of text chunks for annotation. Defaults to 4000.
+
+        Returns:
+            PlanEstimate: The estimated calls and tokens.
+        """
+        schema_tokens = estimate_tokens(json.dumps(self.json_schema))
+
+        estimate = PlanEstimate(rounds=1)
+        for text_chunk in self._chunk_text(text, chunk_size):
+            prompt = self.annotation_prompt.format(text=text_chunk)
+            estimate.calls += 1
+            estimate.prompt_tokens += estimate_tokens(prompt) + schema_tokens
+            estimate.completion_tokens += len(self.targets) * _TOKENS_PER_INDEX
+
+        return estimate
+
+    @classmethod
+    def project_plan(
+        cls,
+        target_name: str,
+        text: str,
+        num_targets: int,
+        tokens_per_target: int = TOKENS_PER_TARGET,
+        chunk_size=4000,
+    ) -> PlanEstimate:
+        """
+        Estimates the calls and tokens `annotate` would use before the targets exist,
+        from a projected number of targets. Each chunk's prompt repeats the full target
+        list, estimated at `tokens_per_target` per target.
+
+        Args:
+            target_name (str): The name of the target class.
+            text (str): The text to annotate.
+            num_targets (int): The projected number of targets.
+            tokens_per_target (int, optional): The estimated tokens per target object.
+            chunk_size (int, optional): The size of text chunks for annotation. Defaults to 4000.
+
+        Returns:
+            PlanEstimate: The estimated calls and tokens.
+        """
+        template = cls._create_annotation_template(target_name, "")
+        # The schema also holds an example target
+        schema = cls._create_json_schema(target_name, {}, num_targets)
+        schema_tokens = estimate_tokens(json.dumps(schema)) + tokens_per_target
+        targets_tokens = num_targets * tokens_per_target
+
+        estimate = PlanEstimate(rounds=1)
+        for text_chunk in cls._chunk_text(text, chunk_size):
+            prompt = template.replace("{text}", text_chunk)
+            estimate.calls += 1
+            estimate.prompt_tokens += (
+                estimate_tokens(prompt) + targets_tokens + schema_tokens
+            )
+            estimate.completion_tokens += num_targets * _TOKENS_PER_INDEX
+
+        return estimate
@@ -1,11 +1,14 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
 import logging
-from typing import List, Optional, Sequence, Type
+from typing import List, Optional, Sequence, Set, Tuple, Type
 
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain.pydantic_v1 import BaseModel, Field, create_model
 
+from .plan import TOKENS_PER_TARGET, PlanEstimate, estimate_tokens
+
 
 class Consolidator:
     """
@@ -42,10 +45,24 @@ class Consolidator:
         self.target_desc = target_class.__doc__
         self.additional_instructions = additional_instructions
 
+        # Tracked class, recording which inputs were merged into each target
+        self.tracked_target_type = create_model(
+            self.target_name,
+            __base__=target_class,
+            sources=(
+                List[int],
+                Field(
+                    ...,
+                    description=f"The indices of the input {self.target_name}s "
+                    f"combined into this {self.target_name}",
+                ),
+            ),
+        )
+
         # Grouped class
         fields = {
             f"{self.target_name}s": (
-                Sequence[target_class],
+                Sequence[self.tracked_target_type],
                 Field(..., description=f"A list of {self.target_name}s"),
             ),
         }
@@ -53,10 +70,10 @@ class Consolidator:
         self.grouped_target_type.__doc__ = f"A list of {self.target_name}s"
 
         # Create runnable
-        prompt = self._create_consolidation_prompt(
+        self.consolidation_prompt = self._create_consolidation_prompt(
             target_class, additional_instructions
         )
-        self.consolidation_runnable = prompt | ChatOpenAI(
+        self.consolidation_runnable = self.consolidation_prompt | ChatOpenAI(
             model=model
         ).with_structured_output(self.grouped_target_type)
 
@@ -75,22 +92,39 @@ class Consolidator:
             + f"Where possible, combine similar {target_class.__name__}s into one."
             + f"Look for cases where the same {target_class.__name__} is referred to by "
             + "different names. Avoid repetition and redundancy."
+            + f" For each {target_class.__name__}, list in sources the indices of the "
+            + f"given {target_class.__name__}s that were combined into it."
             + f"\n {additional_instructions}"
         )
         return ChatPromptTemplate.from_template(prompt)
 
-    def _consolidate_batch(self, targets: List[BaseModel]) -> list:
+    def _consolidate_batch(
+        self, targets: List[BaseModel], sources: List[Set[int]]
+    ) -> List[Tuple[BaseModel, Set[int]]]:
         """
         Consolidates a batch of target objects using the consolidation chain.
 
         Args:
             targets (List[BaseModel]): The batch of target objects to be consolidated.
+            sources (List[Set[int]]): The source chunk ids of each target object.
 
         Returns:
-            list: The consolidated list of target objects.
+            List[Tuple[BaseModel, Set[int]]]: The consolidated target objects, each with
+                the union of the source chunk ids of the inputs combined into it.
         """
-        result = self.consolidation_runnable.invoke({"targets": targets})
-        return getattr(result, self.target_name + "s")
+        result = self.consolidation_runnable.invoke(
+            {"targets": {i: target for i, target in enumerate(targets)}}
+        )
+
+        consolidated = []
+        for tracked in getattr(result, self.target_name + "s"):
+            merged = set()
+            for i in tracked.sources:
+                if 0 <= i < len(targets):
+                    merged |= sources[i]
+            target = self.target_class(**tracked.dict(exclude={"sources"}))
+            consolidated.append((target, merged))
+        return consolidated
 
     def consolidate(self, items: List[BaseModel], current_iter: int = 0) -> list:
         """
@@ -103,24 +137,93 @@ class Consolidator:
         Returns:
             list: The consolidated grouped list of target objects.
         """
+        sources = [set() for _ in items]
+        return self.consolidate_with_sources(items, sources, current_iter)[0]
+
+    def consolidate_with_sources(
+        self, items: List[BaseModel], sources: List[Set[int]], current_iter: int = 0
+    ) -> Tuple[list, List[Set[int]]]:
+        """
+        Consolidates a list of target objects into a grouped list, carrying the union
+        of the source chunk ids of the merged items through each round.
+
+        Args:
+            items (List[BaseModel]): The list of target objects to be consolidated.
+            sources (List[Set[int]]): The source chunk ids of each target object.
+            current_iter (int): The current iteration count for consolidation.
+
+        Returns:
+            Tuple[list, List[Set[int]]]: The consolidated grouped list of target objects,
+                and the source chunk ids of each.
+        """
         batches = [
-            items[i : i + self.batch_size]
+            (items[i : i + self.batch_size], sources[i : i + self.batch_size])
             for i in range(0, len(items), self.batch_size)
         ]
 
         with ThreadPoolExecutor(max_workers=10) as executor:
             futures = [
-                executor.submit(self._consolidate_batch, batch) for batch in batches
+                executor.submit(self._consolidate_batch, *batch) for batch in batches
             ]
             results = []
+            result_sources = []
             for future in as_completed(futures):
-                result = future.result()
-                results.extend(result)
+                for target, merged in future.result():
+                    results.append(target)
+                    result_sources.append(merged)
+
+        if self._should_continue(len(results), current_iter):
+            return self.consolidate_with_sources(
+                results, result_sources, current_iter + 1
+            )
+
+        return results, result_sources
 
-        if (
-            len(results) >= self.target_num * self.tolerance
+    def _should_continue(self, num_results: int, current_iter: int) -> bool:
+        """
+        Whether another consolidation round is needed for the given result count.
+        """
+        return (
+            num_results >= self.target_num * self.tolerance
             and current_iter < self.max_iter
-        ):
-            return self.consolidate(results, current_iter + 1)
+        )
 
-        return results
+    def plan(
+        self, num_items: int, tokens_per_target: int = TOKENS_PER_TARGET
+    ) -> PlanEstimate:
+        """
+        Estimates the calls and tokens `consolidate` would use, without calling the
+        model. Each batch is assumed to consolidate to at most `target_num` items.
+
+        Args:
+            num_items (int): The number of target objects to be consolidated.
+            tokens_per_target (int, optional): The estimated tokens per target object.
+
+        Returns:
+            PlanEstimate: The estimated calls, tokens, rounds and final target count.
+        """
+        prompt_tokens = estimate_tokens(self.consolidation_prompt.format(targets=""))
+        schema_tokens = estimate_tokens(json.dumps(self.grouped_target_type.schema()))
+
+        estimate = PlanEstimate()
+        current_iter = 0
+        while num_items:
+            results = 0
+            for i in range(0, num_items, self.batch_size):
+                batch_size = min(self.batch_size, num_items - i)
+                batch_results = min(batch_size, self.target_num)
+                estimate.calls += 1
+                estimate.prompt_tokens += (
+                    prompt_tokens + schema_tokens + batch_size * tokens_per_target
+                )
+                estimate.completion_tokens += batch_results * tokens_per_target
+                results += batch_results
+            estimate.rounds += 1
+            estimate.targets = results
+
+            if not self._should_continue(results, current_iter):
+                break
+            num_items = results
+            current_iter += 1
+
+        return estimate
@@ -1,11 +1,14 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
 import logging
-from typing import Generator, Iterable, List, Optional, Sequence, Union
+from typing import Generator, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 from langchain.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain.pydantic_v1 import BaseModel, Field, create_model
 
+from .plan import TOKENS_PER_TARGET, PlanEstimate, estimate_tokens
+
 
 class Extractor:
     """
@@ -45,10 +48,10 @@ class Extractor:
         self.grouped_target_type.__doc__ = f"A list of {self.target_name}s"
 
         # Create runnable
-        prompt = self._create_extraction_prompt(
+        self.extraction_prompt = self._create_extraction_prompt(
             target_class, additional_instructions, target_examples
         )
-        self.extraction_runnable = prompt | ChatOpenAI(
+        self.extraction_runnable = self.extraction_prompt | ChatOpenAI(
             model=model
         ).with_structured_output(self.grouped_target_type)
 
@@ -89,45 +92,107 @@ class Extractor:
         )
         return getattr(result, self.target_name + "s")
 
-    def extract(
-        self, input_data: Union[str, Iterable, Generator], chunk_size=4000, **kwargs
-    ) -> list:
-        pool = ThreadPoolExecutor(max_workers=10)
-        futures = []
+    def _chunk_input(
+        self, input_data: Union[str, Iterable, Generator], chunk_size: int
+    ) -> Generator[str, None, None]:
+        """
+        Splits the input data into the chunks sent to the model.
+
+        Args:
+            input_data (Union[str, Iterable, Generator]): A string or a stream of strings.
+            chunk_size (int): The size of text chunks for extraction.
 
+        Yields:
+            str: The next text chunk.
+        """
         if isinstance(input_data, str):
             # Input is a string, process it in chunks
             for i in range(0, len(input_data), chunk_size):
-                text_chunk = input_data[i : i + chunk_size]
-                futures.append(
-                    pool.submit(self._extract_from_block, text_chunk, **kwargs)
-                )
+                yield input_data[i : i + chunk_size]
         else:
             # Input is a stream or generator, process it iteratively
             text_chunk = ""
             for piece in input_data:
                 text_chunk += piece
                 if len(text_chunk) >= chunk_size:
-                    # Submit the current chunk for processing
-                    futures.append(
-                        pool.submit(self._extract_from_block, text_chunk, **kwargs)
-                    )
+                    yield text_chunk
                     text_chunk = ""
             # Make sure to process the last chunk if it's not empty
             if text_chunk:
-                futures.append(
-                    pool.submit(self._extract_from_block, text_chunk, **kwargs)
-                )
+                yield text_chunk
+
+    def extract(
+        self, input_data: Union[str, Iterable, Generator], chunk_size=4000, **kwargs
+    ) -> list:
+        return self.extract_with_sources(input_data, chunk_size, **kwargs)[0]
+
+    def extract_with_sources(
+        self, input_data: Union[str, Iterable, Generator], chunk_size=4000, **kwargs
+    ) -> Tuple[list, List[Set[int]]]:
+        """
+        Extracts targets from the input data, keeping track of the chunk each one
+        was extracted from.
+
+        Args:
+            input_data (Union[str, Iterable, Generator]): A string or a stream of strings.
+            chunk_size (int, optional): The size of text chunks for extraction.
+
+        Returns:
+            Tuple[list, List[Set[int]]]: The extracted targets, and for each target the
+                0-based ids of the chunks it was extracted from.
+        """
+        pool = ThreadPoolExecutor(max_workers=10)
+        futures = {
+            pool.submit(self._extract_from_block, text_chunk, **kwargs): chunk_id
+            for chunk_id, text_chunk in enumerate(
+                self._chunk_input(input_data, chunk_size)
+            )
+        }
 
         # Retrieve results as they complete
         results = []
+        sources = []
         completed = 0
         for future in as_completed(futures):
             # Get the result of the future
             result = future.result()
             # Since the result itself might be a list, we extend our result list with it
             results.extend(result)
+            sources.extend({futures[future]} for _ in result)
             completed += 1
             self._logger.debug(f"Finished {completed} of {len(futures)}")
 
-        return results
+        return results, sources
+
+    def plan(
+        self,
+        input_data: Union[str, Iterable, Generator],
+        chunk_size=4000,
+        number: int = None,
+        tokens_per_target: int = TOKENS_PER_TARGET,
+    ) -> PlanEstimate:
+        """
+        Estimates the calls and tokens `extract` would use, without calling the model.
+        Streams and generators are consumed.
+
+        Args:
+            input_data (Union[str, Iterable, Generator]): A string or a stream of strings.
+            chunk_size (int, optional): The size of text chunks for extraction.
+            number (int, optional): The number of targets to look for per chunk.
+            tokens_per_target (int, optional): The estimated tokens per returned target.
+
+        Returns:
+            PlanEstimate: The estimated calls, tokens and extracted targets.
+        """
+        number = number or self.target_num
+        schema_tokens = estimate_tokens(json.dumps(self.grouped_target_type.schema()))
+
+        estimate = PlanEstimate(rounds=1)
+        for text_chunk in self._chunk_input(input_data, chunk_size):
+            prompt = self.extraction_prompt.format(text=text_chunk, target_num=number)
+            estimate.calls += 1
+            estimate.prompt_tokens += estimate_tokens(prompt) + schema_tokens
+            estimate.completion_tokens += number * tokens_per_target
+            estimate.targets += number
+
+        return estimate
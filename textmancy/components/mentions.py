@@ -0,0 +1,288 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging
+import re
+from typing import Iterable, Iterator, List, NamedTuple, Sequence, Union
+
+from langchain.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+from langchain.pydantic_v1 import BaseModel
+from thefuzz import fuzz, process
+
+
+class Mention(NamedTuple):
+    """A span of text referring to a target."""
+
+    target: int
+    start: int
+    end: int
+    page: int
+
+
+class MentionIndex:
+    """
+    A compact, array-backed index of mentions, sorted by start offset.
+
+    Offsets are relative to the concatenation of all indexed pages.
+
+    Attributes:
+        page_starts (array): The start offset of each page.
+    """
+
+    def __init__(self, mentions: Iterable[Mention] = (), page_starts: Sequence[int] = (0,)):
+        ordered = sorted(mentions, key=lambda m: (m.start, m.end, m.target))
+        self._targets = array("i", (m.target for m in ordered))
+        self._starts = array("q", (m.start for m in ordered))
+        self._ends = array("q", (m.end for m in ordered))
+        self._pages = array("i", (m.page for m in ordered))
+        self._max_span = max((m.end - m.start for m in ordered), default=0)
+        self.page_starts = array("q", page_starts)
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def __getitem__(self, i: int) -> Mention:
+        return Mention(self._targets[i], self._starts[i], self._ends[i], self._pages[i])
+
+    def __iter__(self) -> Iterator[Mention]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def between(self, start: int, end: int) -> List[Mention]:
+        """
+        Returns the mentions overlapping the range [start, end).
+        """
+        lo = bisect_left(self._starts, start - self._max_span)
+        hi = bisect_left(self._starts, end)
+        return [self[i] for i in range(lo, hi) if self._ends[i] > start]
+
+    def in_page(self, page: int) -> List[Mention]:
+        """
+        Returns the mentions in the given page.
+        """
+        lo = bisect_left(self._pages, page)
+        hi = bisect_right(self._pages, page)
+        return [self[i] for i in range(lo, hi)]
+
+    def for_target(self, target: int) -> List[Mention]:
+        """
+        Returns the mentions of the given target.
+        """
+        return [self[i] for i, t in enumerate(self._targets) if t == target]
+
+
+class MentionIndexer:
+    """
+    A class for locating every mention of a list of targets in a text.
+
+    Targets are matched by their `name` and `known_as` aliases in a single regex pass.
+    Capitalized words that are not an exact alias are fuzzy-matched against single-word
+    aliases. The model is only used to resolve aliases shared by several targets.
+
+    Attributes:
+        targets (List[BaseModel]): The list of target objects to locate in the text.
+        fuzzy_threshold (int): The minimum similarity score (0-100) for a fuzzy match.
+        resolve_ambiguous (bool): Whether to resolve shared aliases with the model.
+        context_size (int): The number of characters around an ambiguous mention
+            given to the model.
+        resolve_batch_size (int): The maximum number of occurrences of the same
+            ambiguous alias resolved in one model call.
+    """
+
+    def __init__(
+        self,
+        targets: List[BaseModel],
+        model: str = "gpt-4o",
+        fuzzy_threshold: int = 90,
+        resolve_ambiguous: bool = True,
+        context_size: int = 300,
+        resolve_batch_size: int = 20,
+    ):
+        # Logger
+        self._logger = logging.getLogger(__name__)
+
+        # Vars
+        self.targets = targets
+        self.fuzzy_threshold = fuzzy_threshold
+        self.resolve_ambiguous = resolve_ambiguous
+        self.context_size = context_size
+        self.resolve_batch_size = resolve_batch_size
+        self.target_name = targets[0].__class__.__name__ if targets else "Target"
+
+        # Alias lookup
+        self._aliases = {}
+        for i, target in enumerate(targets):
+            names = [getattr(target, "name", None)] + list(getattr(target, "known_as", []))
+            for alias in names:
+                if alias and alias.strip():
+                    self._aliases.setdefault(alias.strip().lower(), set()).add(i)
+        self._fuzzy_choices = [alias for alias in self._aliases if " " not in alias]
+        self._fuzzy_cache = {}
+
+        # Longest aliases first, so multi-word aliases win over their parts
+        alias_pattern = "|".join(
+            re.escape(alias) for alias in sorted(self._aliases, key=len, reverse=True)
+        )
+        self._pattern = re.compile(
+            rf"(?P<alias>(?i:\b(?:{alias_pattern or '(?!)'})\b))|(?P<word>\b[A-Z]\w{{3,}})"
+        )
+
+        # Schema
+        self.json_schema = {
+            "title": "Resolution",
+            "description": f"The {self.target_name} referred to in each passage.",
+            "type": "object",
+            "properties": {
+                "indices": {
+                    "title": "Indices",
+                    "description": (
+                        f"The 0-based index of the {self.target_name} referred to in "
+                        "each passage, in passage order."
+                    ),
+                    "type": "array",
+                    "items": {"type": "number"},
+                },
+            },
+        }
+
+        # Create runnable
+        prompt = self._create_resolution_prompt()
+        self.resolution_runnable = prompt | ChatOpenAI(
+            model=model
+        ).with_structured_output(self.json_schema)
+
+    def _create_resolution_prompt(self) -> ChatPromptTemplate:
+        return ChatPromptTemplate.from_template(
+            f"You are tasked with resolving which {self.target_name} a text refers to. "
+            "Here is an indexed list of candidates: \n {candidates}\n"
+            "Here are the numbered passages: \n {passages} \n"
+            f"For each passage, in order, please return the index of the {self.target_name} "
+            'referred to as "{mention}" in that passage.'
+        )
+
+    def _lookup(self, match: re.Match) -> set:
+        """
+        Returns the candidate target indices for a regex match.
+        """
+        word = match.group().lower()
+        if match.lastgroup == "alias":
+            return self._aliases[word]
+
+        if word not in self._fuzzy_cache:
+            best = process.extractOne(
+                word,
+                self._fuzzy_choices,
+                scorer=fuzz.ratio,
+                score_cutoff=self.fuzzy_threshold,
+            )
+            self._fuzzy_cache[word] = self._aliases[best[0]] if best else set()
+        return self._fuzzy_cache[word]
+
+    def _resolve_batch(
+        self, contexts: List[str], mention: str, candidates: set
+    ) -> List[set]:
+        """
+        Resolves several occurrences of an ambiguous mention using a single model call.
+
+        Args:
+            contexts (List[str]): The text surrounding each occurrence.
+            mention (str): The mention text.
+            candidates (set): The candidate target indices.
+
+        Returns:
+            List[set]: For each occurrence, the resolved target index, or all candidates
+                if it could not be resolved.
+        """
+        result = self.resolution_runnable.invoke(
+            {
+                "passages": "\n".join(
+                    f"{i}: {context!r}" for i, context in enumerate(contexts)
+                ),
+                "mention": mention,
+                "candidates": {i: self.targets[i] for i in sorted(candidates)},
+            }
+        )
+        indices = (result or {}).get("indices") or []
+
+        resolved = []
+        for i in range(len(contexts)):
+            index = indices[i] if i < len(indices) else None
+            if index is not None and int(index) in candidates:
+                resolved.append({int(index)})
+            else:
+                resolved.append(candidates)
+        return resolved
+
+    def index(self, pages: Union[str, Sequence[str]]) -> MentionIndex:
+        """
+        Locates every target mention in the given text.
+
+        Args:
+            pages (Union[str, Sequence[str]]): The text, or a list of pages.
+
+        Returns:
+            MentionIndex: The index of all mentions found.
+        """
+        if isinstance(pages, str):
+            pages = [pages]
+
+        mentions = []
+        ambiguous = []
+        page_starts = []
+        offset = 0
+        for page_num, page in enumerate(pages):
+            page_starts.append(offset)
+            for match in self._pattern.finditer(page):
+                candidates = self._lookup(match)
+                if len(candidates) > 1 and self.resolve_ambiguous:
+                    ambiguous.append((page_num, page, match))
+                    continue
+                mentions.extend(
+                    Mention(i, offset + match.start(), offset + match.end(), page_num)
+                    for i in candidates
+                )
+            offset += len(page)
+
+        # Group occurrences of the same ambiguous alias and resolve them in batches
+        groups = {}
+        for page_num, page, match in ambiguous:
+            key = (match.group().lower(), frozenset(self._lookup(match)))
+            groups.setdefault(key, []).append((page_num, page, match))
+
+        batches = []
+        for (mention, candidates), occurrences in groups.items():
+            for i in range(0, len(occurrences), self.resolve_batch_size):
+                batches.append(
+                    (mention, set(candidates), occurrences[i : i + self.resolve_batch_size])
+                )
+
+        if batches:
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                futures = {}
+                for mention, candidates, occurrences in batches:
+                    contexts = [
+                        page[
+                            max(0, match.start() - self.context_size) : match.end()
+                            + self.context_size
+                        ]
+                        for _, page, match in occurrences
+                    ]
+                    future = executor.submit(
+                        self._resolve_batch, contexts, mention, candidates
+                    )
+                    futures[future] = occurrences
+
+                completed = 0
+                for future in as_completed(futures):
+                    occurrences = futures[future]
+                    for (page_num, _, match), targets in zip(
+                        occurrences, future.result()
+                    ):
+                        start = page_starts[page_num] + match.start()
+                        end = page_starts[page_num] + match.end()
+                        mentions.extend(Mention(i, start, end, page_num) for i in targets)
+                    completed += 1
+                    self._logger.debug(f"Resolved {completed} of {len(futures)} batches")
+
+        return MentionIndex(mentions, page_starts or (0,))
@@ -0,0 +1,76 @@
+import math
+from typing import Dict, Optional
+
+from langchain.pydantic_v1 import BaseModel, Field
+
+# Rough average for English prose with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+# Rough size of a single structured target in a completion
+TOKENS_PER_TARGET = 100
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimates the number of tokens in the given text without loading a tokenizer.
+
+    Args:
+        text (str): The text to estimate.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class PlanEstimate(BaseModel):
+    """
+    A dry-run estimate of the model calls and tokens a run will use.
+    """
+
+    calls: int = Field(0, description="Number of model calls")
+    prompt_tokens: int = Field(0, description="Estimated prompt tokens")
+    completion_tokens: int = Field(0, description="Estimated completion tokens")
+    rounds: int = Field(0, description="Number of sequential rounds of calls")
+    targets: int = Field(0, description="Projected number of targets produced")
+    stages: Dict[str, "PlanEstimate"] = Field(
+        default_factory=dict, description="Per-stage breakdown of the estimate"
+    )
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def __add__(self, other: "PlanEstimate") -> "PlanEstimate":
+        return PlanEstimate(
+            calls=self.calls + other.calls,
+            prompt_tokens=self.prompt_tokens + other.prompt_tokens,
+            completion_tokens=self.completion_tokens + other.completion_tokens,
+            rounds=self.rounds + other.rounds,
+            targets=self.targets + other.targets,
+        )
+
+    def duration(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> float:
+        """
+        Estimates the run time in seconds when bound by the given rate limits.
+
+        Args:
+            requests_per_minute (float, optional): The request rate limit.
+            tokens_per_minute (float, optional): The token rate limit.
+
+        Returns:
+            float: The estimated number of seconds, 0 if no limits are given.
+        """
+        minutes = 0.0
+        if requests_per_minute:
+            minutes = max(minutes, self.calls / requests_per_minute)
+        if tokens_per_minute:
+            minutes = max(minutes, self.total_tokens / tokens_per_minute)
+        return minutes * 60
+
+
+PlanEstimate.update_forward_refs()
@@ -1,21 +1,18 @@
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 import logging
+import time
 
 from langchain.pydantic_v1 import BaseModel
 
+from .annotator import Annotator
 from .consolidator import Consolidator
 from .extractor import Extractor
+from .plan import TOKENS_PER_TARGET, PlanEstimate
+from .result import TextmancyResult
 from .. import utils
 
 
-class TextmancyResult(BaseModel):
-    """
-    A class that represents the result of processing a text corpus.
-    """
-
-    targets: list
-    annotations: list[int]
-
-
 class Processor:
     def __init__(
         self,
@@ -24,7 +21,15 @@ class Processor:
         model: str = "gpt-4o",
         extractor_args: dict = {},
         consolidator_args: dict = {},
+        annotator_args: dict = {},
+        chunk_size: int = 4000,
+        stream_chunk_size: int = 10000,
     ):
+        self.target_class = target_class
+        self.model = model
+        self.annotator_args = annotator_args
+        self.chunk_size = chunk_size
+        self.stream_chunk_size = stream_chunk_size
 
         self.extractor = Extractor(
             target_class=target_class,
@@ -40,22 +45,201 @@ class Processor:
         )
         self._logger = logging.getLogger(__name__)
 
-    def process(self, texts: list[str]) -> TextmancyResult:
+    def process(
+        self,
+        texts: list[str],
+        annotate: bool = False,
+        reuse_provenance: bool = False,
+        coverage_threshold: float = 0.5,
+    ) -> TextmancyResult:
         """
         Extracts featres from text, consolidates and then annotates the given text fragments.
+
+        The targets extracted from the chunks overlapping each text fragment are stored in
+        `provenance_pages`. Since chunks span several fragments, these are candidates
+        rather than confirmed annotations.
+
+        With `reuse_provenance`, the annotator skips the targets already among a
+        fragment's candidates, and the targets that are candidates in at least
+        `coverage_threshold` of the fragments. `annotations` then only holds the targets
+        confirmed by the annotator; use `combined_annotations` for the full mapping.
+
+        Args:
+            texts (list[str]): The text fragments, e.g. pages, to process.
+            annotate (bool, optional): Whether to annotate each text fragment with the
+                consolidated targets. Defaults to False.
+            reuse_provenance (bool, optional): Whether to skip annotating targets already
+                attributed from the extraction chunks. Defaults to False.
+            coverage_threshold (float, optional): The fraction of fragments above which
+                a target is not annotated with `reuse_provenance`. Defaults to 0.5.
+
+        Returns:
+            TextmancyResult: The consolidated targets, annotations, provenance and run
+                metadata.
         """
+        started = time.time()
+        timings = {}
 
         # Create text stream for extractor
         self._logger.info("Creating text stream for extraction")
-        text_stream = utils.text_generator(texts, max_chunk_size=10000)
+        text_stream = utils.text_generator(texts, max_chunk_size=self.stream_chunk_size)
 
         # Extract and consolidate
         self._logger.info("Extracting features")
-        results = self.extractor.extract(text_stream)
+        stage_started = time.perf_counter()
+        results, sources = self.extractor.extract_with_sources(
+            text_stream, chunk_size=self.chunk_size
+        )
+        timings["extract"] = time.perf_counter() - stage_started
         self._logger.debug(f"Extracted {len(results)} features")
 
         self._logger.info("Consolidating features")
-        consolidated = self.consolidator.consolidate(results)
+        stage_started = time.perf_counter()
+        consolidated, sources = self.consolidator.consolidate_with_sources(
+            results, sources
+        )
+        timings["consolidate"] = time.perf_counter() - stage_started
         self._logger.debug(f"Consolidated into {len(consolidated)} features")
 
-        return consolidated
+        provenance = [sorted(s) for s in sources]
+        chunk_pages = self._chunk_pages(texts)
+
+        provenance_pages = [set() for _ in texts]
+        for target, chunks in enumerate(provenance):
+            for chunk in chunks:
+                for page in chunk_pages[chunk]:
+                    provenance_pages[page].add(target)
+
+        annotations = []
+        annotated = 0
+        if annotate and consolidated:
+            self._logger.info("Annotating texts")
+            stage_started = time.perf_counter()
+            skipped = [set() for _ in texts]
+            if reuse_provenance:
+                coverage = [0] * len(consolidated)
+                for targets in provenance_pages:
+                    for target in targets:
+                        coverage[target] += 1
+                covered = {
+                    target
+                    for target, count in enumerate(coverage)
+                    if count >= coverage_threshold * len(texts)
+                }
+                skipped = [targets | covered for targets in provenance_pages]
+
+            annotations, annotated = self._annotate(texts, consolidated, skipped)
+            timings["annotate"] = time.perf_counter() - stage_started
+            self._logger.debug(f"Annotated {annotated} of {len(texts)} texts")
+
+        return TextmancyResult(
+            targets=consolidated,
+            annotations=annotations,
+            provenance=provenance,
+            provenance_pages=[sorted(targets) for targets in provenance_pages],
+            metadata={
+                "target_class": self.target_class.__name__,
+                "model": self.model,
+                "texts": len(texts),
+                "extracted": len(results),
+                "annotated": annotated,
+                "reuse_provenance": annotate and reuse_provenance,
+                "chunk_pages": chunk_pages,
+                "started": started,
+                "duration": time.time() - started,
+                "timings": timings,
+            },
+        )
+
+    def _annotate(
+        self, texts: list[str], targets: list, skipped: list[set]
+    ) -> tuple[list[list[int]], int]:
+        """
+        Annotates each text with the targets not skipped for it. Texts checking the same
+        targets share an annotator.
+
+        Returns:
+            tuple[list[list[int]], int]: The target indices found in each text, and the
+                number of texts annotated.
+        """
+        groups = {}
+        for page, page_skipped in enumerate(skipped):
+            remaining = frozenset(range(len(targets))) - page_skipped
+            if remaining:
+                groups.setdefault(remaining, []).append(page)
+
+        annotations = [[] for _ in texts]
+        annotated = 0
+        for remaining, pages in groups.items():
+            ordered = sorted(remaining)
+            annotator = Annotator(
+                targets=[targets[target] for target in ordered],
+                model=self.model,
+                **self.annotator_args,
+            )
+            for page in pages:
+                found = annotator.annotate(texts[page])
+                annotations[page] = sorted(ordered[i] for i in found)
+                annotated += 1
+        return annotations, annotated
+
+    def _chunk_pages(self, texts: list[str]) -> list[list[int]]:
+        """
+        Returns the indices of the texts overlapping each extraction chunk, by
+        replaying the chunking used in `process`.
+        """
+        text_ends = list(accumulate(len(text) for text in texts))
+        text_stream = utils.text_generator(texts, max_chunk_size=self.stream_chunk_size)
+
+        chunk_pages = []
+        start = 0
+        for chunk in self.extractor._chunk_input(text_stream, self.chunk_size):
+            end = start + len(chunk)
+            first = bisect_right(text_ends, start)
+            last = bisect_left(text_ends, end)
+            chunk_pages.append(list(range(first, last + 1)))
+            start = end
+        return chunk_pages
+
+    def plan(
+        self,
+        texts: list[str],
+        tokens_per_target: int = TOKENS_PER_TARGET,
+        annotate: bool = False,
+    ) -> PlanEstimate:
+        """
+        Estimates the calls and tokens `process` would use, without calling the model.
+        Consolidation input is projected from the extractor's `target_num` per chunk.
+        With `annotate`, every text is projected to be annotated against the number
+        of targets consolidation is projected to end with.
+        """
+        text_stream = utils.text_generator(texts, max_chunk_size=self.stream_chunk_size)
+
+        extraction = self.extractor.plan(
+            text_stream,
+            chunk_size=self.chunk_size,
+            tokens_per_target=tokens_per_target,
+        )
+        consolidation = self.consolidator.plan(
+            extraction.targets, tokens_per_target=tokens_per_target
+        )
+
+        estimate = extraction + consolidation
+        estimate.targets = consolidation.targets
+        estimate.stages = {"extract": extraction, "consolidate": consolidation}
+
+        if annotate:
+            annotation = PlanEstimate()
+            for text in texts:
+                annotation += Annotator.project_plan(
+                    self.target_class.__name__,
+                    text,
+                    consolidation.targets,
+                    tokens_per_target=tokens_per_target,
+                )
+            stages = estimate.stages
+            estimate = estimate + annotation
+            estimate.targets = consolidation.targets
+            estimate.stages = {**stages, "annotate": annotation}
+
+        return estimate
@@ -0,0 +1,373 @@
+from array import array
+from collections.abc import Sequence
+import importlib
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Callable, Optional, Type
+import uuid
+
+from langchain.pydantic_v1 import BaseModel, Field
+
+# On-disk format:
+#   header:  MAGIC, u16 version, u16 reserved
+#   records: target JSON and little-endian u32 index arrays, in write order
+#   tables:  little-endian u64 (start, end) pairs for each kind of record
+#   index:   JSON with metadata, target class and table positions
+#   footer:  u64 index offset, u64 index length, MAGIC
+MAGIC = b"TXMR"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+_FOOTER = struct.Struct("<QQ4s")
+_RECORD_KINDS = ("targets", "annotations", "provenance", "provenance_pages")
+
+
+def _to_le(values: array) -> bytes:
+    if sys.byteorder == "big":  # pragma: no cover
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_le(typecode: str, data: bytes) -> array:
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":  # pragma: no cover
+        values.byteswap()
+    return values
+
+
+class TextmancyResult(BaseModel):
+    """
+    A class that represents the result of processing a text corpus.
+    """
+
+    targets: list = Field(default_factory=list, description="The consolidated targets")
+    annotations: list[list[int]] = Field(
+        default_factory=list, description="The target indices present in each page"
+    )
+    provenance: list[list[int]] = Field(
+        default_factory=list, description="The chunk ids that produced each target"
+    )
+    provenance_pages: list[list[int]] = Field(
+        default_factory=list,
+        description="The target indices attributed to each page from its chunks",
+    )
+    metadata: dict = Field(default_factory=dict, description="Metadata about the run")
+
+    def combined_annotations(self) -> list[list[int]]:
+        """
+        Returns the target indices present in each page. When provenance was reused,
+        `annotations` only holds the targets the annotator confirmed, so the targets
+        attributed to each page from its chunks are added to them.
+        """
+        if not self.metadata.get("reuse_provenance"):
+            return [list(annotation) for annotation in self.annotations]
+        return [
+            sorted(set(annotation) | set(attributed))
+            for annotation, attributed in zip(self.annotations, self.provenance_pages)
+        ]
+
+    def save(self, path: str) -> None:
+        """
+        Saves the result to the given path in the textmancy binary format.
+        """
+        target_class = self.targets[0].__class__ if self.targets else None
+        with ResultWriter(path, target_class, self.metadata) as writer:
+            for i, target in enumerate(self.targets):
+                writer.write_target(
+                    target, self.provenance[i] if i < len(self.provenance) else []
+                )
+            for annotation in self.annotations:
+                writer.write_annotation(annotation)
+            for attributed in self.provenance_pages:
+                writer.write_provenance_page(attributed)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        target_class: Optional[Type[BaseModel]] = None,
+        import_target_class: bool = True,
+    ) -> "TextmancyResult":
+        """
+        Loads a result saved with `save`. Targets are constructed without validation.
+        See `ResultReader` for `import_target_class`.
+        """
+        with ResultReader(path, target_class, import_target_class) as reader:
+            return reader.to_result()
+
+
+class ResultWriter:
+    """
+    A class that streams a result to disk in the textmancy binary format.
+
+    Records are written to a temporary file next to `path`, which only replaces
+    `path` once the file is complete. If the writer is used as a context manager
+    and the block raises, the temporary file is discarded.
+
+    Attributes:
+        path (str): The path of the output file.
+        target_class (Type[BaseModel]): The class of the targets written.
+        metadata (dict): Metadata about the run, stored as JSON.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        target_class: Optional[Type[BaseModel]] = None,
+        metadata: Optional[dict] = None,
+    ):
+        self.path = path
+        self.target_class = target_class
+        self.metadata = metadata or {}
+        self._tables = {kind: array("Q") for kind in _RECORD_KINDS}
+        self._temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        self._file = open(self._temp_path, "xb")
+        try:
+            self._file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        except BaseException:
+            self.abort()
+            raise
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _write_record(self, kind: str, data: bytes) -> None:
+        start = self._file.tell()
+        self._file.write(data)
+        self._tables[kind].extend((start, start + len(data)))
+
+    def write_target(self, target: BaseModel, provenance: Sequence = ()) -> None:
+        """
+        Writes a target and the ids of the chunks it was produced from.
+        """
+        if self.target_class is None:
+            self.target_class = target.__class__
+        self._write_record("targets", target.json().encode("utf-8"))
+        self._write_record("provenance", _to_le(array("I", provenance)))
+
+    def write_annotation(self, indices: Sequence) -> None:
+        """
+        Writes the target indices present in the next page.
+        """
+        self._write_record("annotations", _to_le(array("I", sorted(indices))))
+
+    def write_provenance_page(self, indices: Sequence) -> None:
+        """
+        Writes the target indices attributed to the next page from its chunks.
+        """
+        self._write_record("provenance_pages", _to_le(array("I", sorted(indices))))
+
+    def _build_index(self) -> bytes:
+        tables = {}
+        position = self._file.tell()
+        for kind, table in self._tables.items():
+            tables[kind] = [position, len(table) // 2]
+            position += len(table) * table.itemsize
+
+        target_class = None
+        if self.target_class is not None:
+            target_class = (
+                f"{self.target_class.__module__}:{self.target_class.__qualname__}"
+            )
+        return json.dumps(
+            {
+                "version": FORMAT_VERSION,
+                "target_class": target_class,
+                "metadata": self.metadata,
+                "tables": tables,
+            }
+        ).encode("utf-8")
+
+    def close(self) -> None:
+        """
+        Writes the tables, index and footer, closes the file and moves it to `path`.
+        """
+        if self._file.closed:
+            return
+
+        try:
+            # Serialize the index first, so a bad metadata value fails before writing
+            index = self._build_index()
+            for table in self._tables.values():
+                self._file.write(_to_le(table))
+            index_offset = self._file.tell()
+            self._file.write(index)
+            self._file.write(_FOOTER.pack(index_offset, len(index), MAGIC))
+            self._file.close()
+            os.replace(self._temp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self) -> None:
+        """
+        Closes and deletes the unfinished file, leaving `path` untouched.
+        """
+        self._file.close()
+        try:
+            os.remove(self._temp_path)
+        except FileNotFoundError:
+            pass
+
+
+class _LazyRecords(Sequence):
+    """
+    A read-only sequence that decodes records from a memory map on access.
+    """
+
+    def __init__(self, buffer: mmap.mmap, table: array, decode: Callable[[bytes], Any]):
+        self._buffer = buffer
+        self._table = table
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._table) // 2
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("record index out of range")
+        return self._decode(self._buffer[self._table[2 * i] : self._table[2 * i + 1]])
+
+
+class ResultReader:
+    """
+    A class that lazily reads a result saved in the textmancy binary format.
+
+    The file is memory-mapped and records are only decoded when accessed. Targets
+    are constructed without validation, or returned as dicts if their class cannot
+    be imported. The class named in the file is only imported if no `target_class`
+    is given and `import_target_class` is set; disable it for untrusted files.
+
+    Attributes:
+        metadata (dict): Metadata about the run.
+        targets (Sequence): The targets.
+        annotations (Sequence[list[int]]): The target indices present in each page.
+        provenance (Sequence[list[int]]): The chunk ids that produced each target.
+        provenance_pages (Sequence[list[int]]): The target indices attributed to each
+            page from its chunks.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        target_class: Optional[Type[BaseModel]] = None,
+        import_target_class: bool = True,
+    ):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size + _FOOTER.size:
+                raise ValueError(f"{path} is not a textmancy result file")
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            self._read_index(target_class, import_target_class)
+        except ValueError:
+            self._buffer.close()
+            raise
+        except (KeyError, TypeError, struct.error) as e:
+            self._buffer.close()
+            raise ValueError(f"{path} is not a valid textmancy result file") from e
+
+    def _read_index(
+        self, target_class: Optional[Type[BaseModel]], import_target_class: bool
+    ) -> None:
+        size = len(self._buffer)
+        magic, version, _ = _HEADER.unpack_from(self._buffer, 0)
+        index_offset, index_length, footer_magic = _FOOTER.unpack_from(
+            self._buffer, size - _FOOTER.size
+        )
+        if magic != MAGIC or footer_magic != MAGIC:
+            raise ValueError(f"{self.path} is not a textmancy result file")
+        if version > FORMAT_VERSION:
+            raise ValueError(
+                f"{self.path} has format version {version}, "
+                f"only versions up to {FORMAT_VERSION} are supported"
+            )
+        if not _HEADER.size <= index_offset <= size - _FOOTER.size - index_length:
+            raise ValueError(f"{self.path} is truncated or corrupt")
+
+        index = json.loads(self._buffer[index_offset : index_offset + index_length])
+        self.metadata = index["metadata"]
+        self.target_class = target_class
+        if target_class is None and import_target_class:
+            self.target_class = self._import_class(index["target_class"])
+
+        tables = {}
+        for kind in _RECORD_KINDS:
+            # Files written before a kind of record existed have no table for it
+            position, count = index["tables"].get(kind, (_HEADER.size, 0))
+            if not _HEADER.size <= position <= index_offset - 16 * count:
+                raise ValueError(f"{self.path} is truncated or corrupt")
+            tables[kind] = _from_le("Q", self._buffer[position : position + 16 * count])
+
+        self.targets = _LazyRecords(self._buffer, tables["targets"], self._decode_target)
+        self.annotations = _LazyRecords(
+            self._buffer, tables["annotations"], self._decode_indices
+        )
+        self.provenance = _LazyRecords(
+            self._buffer, tables["provenance"], self._decode_indices
+        )
+        self.provenance_pages = _LazyRecords(
+            self._buffer, tables["provenance_pages"], self._decode_indices
+        )
+
+    def __enter__(self) -> "ResultReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @staticmethod
+    def _import_class(path: Optional[str]) -> Optional[Type[BaseModel]]:
+        if not path:
+            return None
+        module_name, _, qualname = path.partition(":")
+        try:
+            obj = importlib.import_module(module_name)
+            for attr in qualname.split("."):
+                obj = getattr(obj, attr)
+        except (ImportError, AttributeError):
+            return None
+        if not (isinstance(obj, type) and issubclass(obj, BaseModel)):
+            return None
+        return obj
+
+    def _decode_target(self, data: bytes):
+        values = json.loads(data)
+        if self.target_class is None:
+            return values
+        return self.target_class.construct(**values)
+
+    @staticmethod
+    def _decode_indices(data: bytes) -> list[int]:
+        return _from_le("I", data).tolist()
+
+    def to_result(self) -> TextmancyResult:
+        """
+        Reads every record into a TextmancyResult.
+        """
+        return TextmancyResult.construct(
+            targets=list(self.targets),
+            annotations=list(self.annotations),
+            provenance=list(self.provenance),
+            provenance_pages=list(self.provenance_pages),
+            metadata=self.metadata,
+        )
+
+    def close(self) -> None:
+        self._buffer.close()
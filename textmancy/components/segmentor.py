@@ -1,6 +1,16 @@
 from abc import ABC, abstractmethod
+import re
 from typing import Optional
 
+from .plan import CHARS_PER_TOKEN
+
+# Natural places to split an oversized segment, in order of preference
+_NATURAL_BREAKS = (
+    re.compile(r"\n"),
+    re.compile(r"[.!?][\"'”’)\]]*\s"),
+    re.compile(r"\s"),
+)
+
 
 class Segmentor(ABC):
     """
@@ -41,9 +51,7 @@ class Segmentor(ABC):
         for i, segment in enumerate(text_segments):
             if len(segment) > self._max_length:
                 if self._handle_length == "split":
-                    segments.extend(
-                        (segment[0: self._max_length], segment[self._max_length:])
-                    )
+                    segments.extend(self._split(segment))
                 elif self._handle_length == "truncate":
                     segments.append(segment[: self._max_length])
                 elif self._handle_length == "raise":
@@ -56,6 +64,34 @@ class Segmentor(ABC):
 
         return segments
 
+    def _split(self, segment: str) -> list[str]:
+        """
+        Splits a segment into pieces no longer than the maximum length, preferring
+        line breaks, then sentence ends, then whitespace.
+        """
+        pieces = []
+        start = 0
+        while len(segment) - start > self._max_length:
+            end = self._find_break(segment, start, start + self._max_length)
+            pieces.append(segment[start:end])
+            start = end
+        pieces.append(segment[start:])
+        return pieces
+
+    def _find_break(self, segment: str, start: int, end: int) -> int:
+        """
+        Finds the last natural break in the second half of segment[start:end].
+        Falls back to end if there is none.
+        """
+        min_break = start + self._max_length // 2
+        for pattern in _NATURAL_BREAKS:
+            last = None
+            for last in pattern.finditer(segment, min_break, end):
+                pass
+            if last is not None and last.end() > start:
+                return last.end()
+        return end
+
 
 class ParagraphSegmentor(Segmentor):
     """
@@ -87,3 +123,113 @@ class PageSegmentor(Segmentor):
             "\n".join(paragraphs[i : i + self._paragraphs_per_page])
             for i in range(0, len(paragraphs), self._paragraphs_per_page)
         ]
+
+
+class SentenceSegmentor(Segmentor):
+    """
+    A class that segments text into sentences.
+    """
+
+    _sentence_end = re.compile(r"[.!?]+[\"'”’)\]]*(?=\s|$)|\n[ \t]*\n")
+    _abbreviation = re.compile(r"\b(?:Mr|Mrs|Ms|Dr|St|Jr|Sr|Prof|Mt|vs|etc)$")
+
+    def _segment(self, text: str) -> list:
+        """
+        Segments the given text into sentences in a single pass over its sentence ends.
+        """
+        sentences = []
+        start = 0
+        for match in self._sentence_end.finditer(text):
+            if match.group() == "." and self._abbreviation.search(
+                text, max(start, match.start() - 4), match.start()
+            ):
+                continue
+            sentence = text[start : match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+
+        sentence = text[start:].strip()
+        if sentence:
+            sentences.append(sentence)
+        return sentences
+
+
+class SceneSegmentor(Segmentor):
+    """
+    A class that segments text into scenes or chapters. A new segment starts at each
+    heading line (e.g. "CHAPTER IV", "Stave One", "II.") and at each separator line
+    (e.g. "* * *"). Separator lines are dropped, heading lines are kept.
+    """
+
+    _boundary = re.compile(
+        r"^[ \t]*(?:"
+        r"(?P<heading>"
+        r"(?:Chapter|Stave|Part|Book|Scene|Act|CHAPTER|STAVE|PART|BOOK|SCENE|ACT)[ \t]+"
+        r"(?i:\d+|[ivxlc]+|one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)"
+        r"\b[^\n]*"
+        r"|[IVXLC]+\.?|\d+\.?)"
+        r"|(?P<separator>(?:[*#~=-][ \t]*){3,})"
+        r")[ \t]*$",
+        re.MULTILINE,
+    )
+
+    def _segment(self, text: str) -> list:
+        """
+        Segments the given text into scenes in a single pass over its boundary lines.
+        """
+        scenes = []
+        start = 0
+        for match in self._boundary.finditer(text):
+            scene = text[start : match.start()].strip()
+            if scene:
+                scenes.append(scene)
+            start = match.start() if match.lastgroup == "heading" else match.end()
+
+        scene = text[start:].strip()
+        if scene:
+            scenes.append(scene)
+        return scenes
+
+
+class TokenPageSegmentor(Segmentor):
+    """
+    A class that segments text into pages of at most `max_tokens` estimated tokens,
+    breaking between paragraphs. Paragraphs longer than a page are split at natural
+    boundaries, unless another `max_length` is given.
+    """
+
+    _paragraph_break = re.compile(r"\n+")
+
+    def __init__(self, max_tokens: int = 1000, **kwargs) -> None:
+        kwargs.setdefault("max_length", max_tokens * CHARS_PER_TOKEN)
+        super().__init__(**kwargs)
+        self._max_tokens = max_tokens
+
+    def _segment(self, text: str) -> list:
+        """
+        Segments the given text into pages in a single pass over its paragraph breaks.
+        """
+        max_chars = self._max_tokens * CHARS_PER_TOKEN
+        pages = []
+        start = 0
+        cut = end = None
+        for match in self._paragraph_break.finditer(text):
+            # Close the page at the previous break if this paragraph overflows it
+            if cut is not None and match.start() - start > max_chars:
+                page = text[start:cut].strip()
+                if page:
+                    pages.append(page)
+                start = end
+            cut, end = match.start(), match.end()
+
+        if cut is not None and len(text) - start > max_chars:
+            page = text[start:cut].strip()
+            if page:
+                pages.append(page)
+            start = end
+
+        page = text[start:].strip()
+        if page:
+            pages.append(page)
+        return pages
@@ -11,8 +11,11 @@ def text_generator(
     """
     next_chunk = ""
     for text in texts:
-        # Split large text
+        # Split large text, after any pending chunk to keep the text in order
         if len(text) > max_chunk_size:
+            if next_chunk:
+                yield next_chunk
+                next_chunk = ""
             for i in range(0, len(text), max_chunk_size):
                 yield text[i : i + max_chunk_size]
 